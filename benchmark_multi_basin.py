@@ -0,0 +1,51 @@
+import os
+import sys
+import time
+import tempfile
+from pathlib import Path
+from multi_basin import BasinConfig, BasinLink, MultiBasinCoordinator
+from sample_basin_data import write_basin
+
+'''
+Timing comparison of MultiBasinCoordinator with one worker vs. one worker per core.
+Usage: python benchmark_multi_basin.py [n_basins] [n_steps]
+'''
+
+
+def run_timed(basins, links, n_workers, n_steps) -> float:
+    """Run the coordinator and return the wall time in seconds."""
+    coordinator = MultiBasinCoordinator(basins, links, n_workers=n_workers)
+    start = time.perf_counter()
+    coordinator.run(n_steps)
+    return time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    n_basins = int(sys.argv[1]) if len(sys.argv) > 1 else 8
+    n_steps = int(sys.argv[2]) if len(sys.argv) > 2 else 2_000
+    n_cores = os.cpu_count() or 1
+
+    with tempfile.TemporaryDirectory() as tmp:
+        basins = []
+        for b in range(n_basins):
+            directory = Path(tmp) / f'basin_{b}'
+            directory.mkdir()
+            basins.append(BasinConfig(**write_basin(directory, precip_scale=1.0 + b)))
+        # Chain basins pairwise so boundary flows are exchanged
+        links = [BasinLink(upstream=b, downstream=b + 1, route_loss=0.9, delay_intervals=8)
+                 for b in range(0, n_basins - 1, 2)]
+
+        # Silence the per-step prints of simulate_step (inherited by the workers)
+        stdout_fd = os.dup(1)
+        devnull = os.open(os.devnull, os.O_WRONLY)
+        os.dup2(devnull, 1)
+        try:
+            sequential = run_timed(basins, links, 1, n_steps)
+            parallel = run_timed(basins, links, n_cores, n_steps)
+        finally:
+            os.dup2(stdout_fd, 1)
+            os.close(devnull)
+
+    print(f"{n_basins} basins x {n_steps} steps")
+    print(f"1 worker:        {sequential:.2f} s")
+    print(f"{n_cores} worker(s):     {parallel:.2f} s  (speedup {sequential / parallel:.2f}x)")
@@ -0,0 +1,214 @@
+import os
+import pickle
+import queue
+import threading
+import traceback
+import numpy as np
+import multiprocessing as mp
+from multiprocessing import shared_memory
+from multiprocessing.connection import wait
+from typing import List, Dict, Optional
+from dataclasses import dataclass
+from power_station_system import PowerStationSystem
+
+
+@dataclass
+class BasinConfig:
+    config_path: str
+    precipitation_path: str
+    price_path: str
+
+
+@dataclass
+class BasinLink:
+    upstream: int  # Index of the basin whose last station feeds the link
+    downstream: int  # Index of the basin whose first station receives it
+    route_loss: float
+    delay_intervals: int
+
+
+def _run_shard(basin_ids: List[int],
+               basins: List[BasinConfig],
+               links: List[BasinLink],
+               n_steps: int,
+               sync_interval: int,
+               outflow_shm_name: str,
+               totals_shm_name: str,
+               barrier,
+               errors):
+    """Step the basins of one shard, exchanging boundary outflows at every barrier."""
+    outflow_shm = totals_shm = None
+    current_basin = None
+    try:
+        outflow_shm = shared_memory.SharedMemory(name=outflow_shm_name)
+        totals_shm = shared_memory.SharedMemory(name=totals_shm_name)
+        outflows = np.ndarray((len(basins), n_steps), dtype=np.float64, buffer=outflow_shm.buf)
+        totals = np.ndarray((len(basins), 2), dtype=np.float64, buffer=totals_shm.buf)
+
+        systems = {}
+        for b in basin_ids:
+            current_basin = b
+            systems[b] = PowerStationSystem(
+                config_path=basins[b].config_path,
+                precipitation_path=basins[b].precipitation_path,
+                price_path=basins[b].price_path)
+        incoming = {b: [link for link in links if link.downstream == b] for b in basin_ids}
+
+        for window_start in range(0, n_steps, sync_interval):
+            for t in range(window_start, min(window_start + sync_interval, n_steps)):
+                for b in basin_ids:
+                    current_basin = b
+                    # Delays are >= sync_interval, so t - delay always lies in a finished window
+                    boundary_inflow = sum(
+                        outflows[link.upstream, t - link.delay_intervals] * link.route_loss
+                        for link in incoming[b]
+                        if t >= link.delay_intervals
+                    )
+                    system = systems[b]
+                    system.simulate_step(boundary_inflow=boundary_inflow)
+                    outflows[b, t] = system.power_stations[-1].outflow
+            current_basin = None
+            barrier.wait()
+
+        for b in basin_ids:
+            totals[b, 0] = systems[b].get_total_energy()
+            totals[b, 1] = systems[b].get_total_revenue()
+    except Exception as e:
+        traceback.print_exc()
+        try:
+            pickle.dumps(e)
+        except Exception:
+            e = RuntimeError(repr(e))
+        # Report before releasing the other shards, so the cause is queued before their follow-up errors
+        errors.put((current_basin, e))
+        barrier.abort()
+        raise SystemExit(1)
+    finally:
+        if outflow_shm is not None:
+            outflow_shm.close()
+        if totals_shm is not None:
+            totals_shm.close()
+
+
+class MultiBasinCoordinator:
+    def __init__(self,
+                 basins: List[BasinConfig],
+                 links: Optional[List[BasinLink]] = None,
+                 n_workers: Optional[int] = None,
+                 sync_interval: Optional[int] = None,
+                 barrier_timeout: float = 600.0):
+        """
+        Run several PowerStationSystem basins in parallel worker processes.
+
+        Args:
+            basins: Data files of each basin
+            links: Boundary flows from the last station of one basin to the first station of another
+            n_workers: Number of worker processes (defaults to the CPU count)
+            sync_interval: Steps between boundary-flow exchanges; must not exceed the shortest link delay
+            barrier_timeout: Seconds a shard waits for the others at a synchronisation point
+        """
+        if not basins:
+            raise ValueError("At least one basin is required")
+        self.basins = basins
+        self.links = links or []
+
+        for link in self.links:
+            if not (0 <= link.upstream < len(basins) and 0 <= link.downstream < len(basins)):
+                raise ValueError(f"Link references unknown basin: {link}")
+            if link.delay_intervals < 1:
+                raise ValueError("Basin links need a delay of at least one interval")
+
+        min_delay = min((link.delay_intervals for link in self.links), default=None)
+        if sync_interval is None:
+            sync_interval = min_delay if min_delay is not None else 96  # 1 day
+        if min_delay is not None and sync_interval > min_delay:
+            raise ValueError(f"sync_interval ({sync_interval}) exceeds the shortest link delay ({min_delay})")
+        if sync_interval < 1:
+            raise ValueError("sync_interval must be at least 1")
+        self.sync_interval = sync_interval
+        self.barrier_timeout = barrier_timeout
+
+        n_workers = n_workers or os.cpu_count() or 1
+        self.n_workers = max(1, min(n_workers, len(basins)))
+        # Round-robin partition of basins into shards
+        self.shards = [list(range(len(basins)))[w::self.n_workers] for w in range(self.n_workers)]
+
+        self.boundary_outflows: Optional[np.ndarray] = None
+        self.totals: Optional[np.ndarray] = None
+
+    def run(self, n_steps: int) -> List[Dict]:
+        """Simulate n_steps in every basin and return per-basin totals."""
+        n_basins = len(self.basins)
+        outflow_shm = shared_memory.SharedMemory(create=True, size=max(1, n_basins * n_steps * 8))
+        totals_shm = shared_memory.SharedMemory(create=True, size=n_basins * 2 * 8)
+        try:
+            outflows = np.ndarray((n_basins, n_steps), dtype=np.float64, buffer=outflow_shm.buf)
+            totals = np.ndarray((n_basins, 2), dtype=np.float64, buffer=totals_shm.buf)
+            outflows[:] = 0.0
+            totals[:] = 0.0
+
+            barrier = mp.Barrier(self.n_workers, timeout=self.barrier_timeout)
+            errors = mp.Queue()
+            workers = [
+                mp.Process(target=_run_shard,
+                           args=(shard, self.basins, self.links, n_steps, self.sync_interval,
+                                 outflow_shm.name, totals_shm.name, barrier, errors))
+                for shard in self.shards
+            ]
+            for worker in workers:
+                worker.start()
+            failed = self._wait_for_workers(workers, barrier)
+            if failed is not None:
+                self._raise_worker_error(failed, self.shards[workers.index(failed)], errors)
+
+            self.boundary_outflows = outflows.copy()
+            self.totals = totals.copy()
+        finally:
+            outflow_shm.close()
+            outflow_shm.unlink()
+            totals_shm.close()
+            totals_shm.unlink()
+
+        return [
+            {'basin_id': b, 'total_energy': float(self.totals[b, 0]), 'total_revenue': float(self.totals[b, 1])}
+            for b in range(n_basins)
+        ]
+
+    @staticmethod
+    def _wait_for_workers(workers: List[mp.Process], barrier) -> Optional[mp.Process]:
+        """Wait for all workers and return the first one that failed, if any."""
+        failed = None
+        pending = {worker.sentinel: worker for worker in workers}
+        while pending:
+            for sentinel in wait(list(pending)):
+                worker = pending.pop(sentinel)
+                worker.join()
+                if worker.exitcode == 0 or failed is not None:
+                    continue
+                failed = worker
+                if worker.exitcode < 0:
+                    # Killed by a signal: it never reported nor aborted the barrier
+                    barrier.abort()
+                    for other in pending.values():
+                        other.terminate()
+                # A worker that failed on its own has already reported and aborted
+                # the barrier, so the others exit by themselves and are joined here
+        return failed
+
+    @staticmethod
+    def _raise_worker_error(failed: mp.Process, shard: List[int], errors):
+        """Raise the first error reported by a worker, chained to its original exception."""
+        reported = []
+        while True:
+            try:
+                reported.append(errors.get(timeout=0.1))
+            except queue.Empty:
+                break
+        # Shards released by an aborted barrier only report the consequence, not the cause
+        reported.sort(key=lambda item: isinstance(item[1], threading.BrokenBarrierError))
+        if reported:
+            basin_id, error = reported[0]
+            where = f"basin {basin_id}" if basin_id is not None else "a basin worker"
+            raise RuntimeError(f"Simulation failed in {where}: {error!r}") from error
+
+        raise RuntimeError(f"Worker for basins {shard} exited with code {failed.exitcode}")
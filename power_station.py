@@ -3,6 +3,8 @@ from typing import Dict
 
 
 class PowerStation:
+    CONVERSION_FACTOR = 0.023  # 0.023 kWh per m³ of turbinate water
+
     def __init__(self,
                  max_water_level: float,
                  initial_water_level: float,
@@ -13,6 +15,7 @@ class PowerStation:
         Initialize a hydroelectric power station.
         """
         self.max_water_level = max_water_level
+        self.initial_water_level = initial_water_level
         self.water_level = initial_water_level
         self.loss_coefficient = loss_coefficient
         self.station_id = station_id
@@ -41,8 +44,7 @@ class PowerStation:
 
     def generate_electricity(self, current_price: float) -> float:
         """Simulate electricity generation."""
-        conversion_factor = 0.023  # 0.023 kWh per m³ of turbinate water
-        energy_generated = self.outflow * conversion_factor
+        energy_generated = self.outflow * self.CONVERSION_FACTOR
         revenue = energy_generated * current_price
 
         self.total_generated += energy_generated
@@ -1,6 +1,8 @@
+import hashlib
+from collections import OrderedDict
 import numpy as np
 import pandas as pd
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional, Sequence
 from dataclasses import dataclass
 from power_station import PowerStation
 
@@ -16,7 +18,8 @@ class PowerStationSystem:
     def __init__(self,
                  config_path: str = 'data/power_stations_config.csv',
                  precipitation_path: str = 'data/precipitation.csv',
-                 price_path: str = 'data/electricity_prices.csv'):
+                 price_path: str = 'data/electricity_prices.csv',
+                 trajectory_cache_size: int = 128):
         """
         Initialize the hydroelectric system by loading data from CSV files.
 
@@ -24,6 +27,7 @@ class PowerStationSystem:
             config_path: Path to power station configuration CSV
             precipitation_path: Path to precipitation data CSV in hours
             price_path: Path to electricity price data CSV in hours
+            trajectory_cache_size: Max station trajectories kept by simulate_trajectories (LRU)
         """
         # Load power station configurations
         try:
@@ -64,6 +68,11 @@ class PowerStationSystem:
         }
         self._init_delay_buffers()
 
+        # What-if trajectories, keyed by station parameters + upstream key
+        self.gate_schedules: List[Optional[np.ndarray]] = [None] * len(self.power_stations)
+        self.trajectory_cache_size = trajectory_cache_size
+        self._trajectory_cache: 'OrderedDict[str, Dict[str, np.ndarray]]' = OrderedDict()
+
     @staticmethod
     def _load_time_series(path: str) -> pd.DataFrame:
         """Load and preprocess time series data."""
@@ -80,12 +89,11 @@ class PowerStationSystem:
             })
 
     # TODO: Eliminar esta mierda de viajes temporales
-    def _process_buffer(self, buffer_id: int, value: float) -> float:
+    @staticmethod
+    def _process_buffer(buffer: Dict[str, Any], value: float) -> float:
         """Process a value through a delay buffer."""
-        buffer: Dict[str, Any] = self.buffers[buffer_id]
         data: np.ndarray = buffer['data']  # Explicitly type the numpy array
         ptr: int = buffer['ptr']
-        print(f"{self.current_time} Station {buffer_id}: {buffer}")
 
         oldest = float(data[ptr])  # Explicit conversion to float
         data[ptr] = value
@@ -107,34 +115,54 @@ class PowerStationSystem:
         except IndexError:
             raise RuntimeError("Time series data doesn't cover simulation period")
 
-    def simulate_step(self):
-        """Run one 15-minute simulation step."""
+    def simulate_step(self, boundary_inflow: float = 0.0):
+        """
+        Run one 15-minute simulation step.
+
+        Args:
+            boundary_inflow: Extra water (m³) entering the first station from an upstream basin
+        """
         water_inflow, price = self.get_current_conditions()
+        water_inflow += boundary_inflow
 
         for i, station in enumerate(self.power_stations):
-            # First station uses precipitation, others use delayed flow
-            if i == 0:
-                station.update_water_level(water_input_m3=water_inflow)
-            else:
-                # TODO: cambiar la forma de aplicar el retado por completo
-                #   inflow[station, t] = outfow[station - 1, t - retardo]
-                inflow = self._process_buffer(i - 1, station.outflow) * self.route_losses[i - 1]
-                station.inflow = inflow
-                station.update_water_level()
+            buffer = self.buffers[i - 1] if i > 0 else None
+            if buffer is not None:
+                print(f"{self.current_time} Station {i - 1}: {buffer}")
+            energy = self._step_station(i, station, buffer, self.current_time, water_inflow, price)
             print(f"{self.current_time} Station {i}: {station.inflow}")
 
-            # New calculation: outflow = 1/1,000,000 of max capacity (per 15-minute step)
-            outflow_per_million = station.max_water_level / 100
-            station.set_outflow(outflow_per_million)  # Fixed flow based on max capacity
-
-            # Generate electricity and record
-            energy = station.generate_electricity(price)
+            # Record
             self.historic_data['outflows'][i].append(station.outflow)
             self.historic_data['energy'][i].append(energy)
             self.historic_data['revenue'][i].append(energy * price)
 
         self.current_time += 1
 
+    def _step_station(self, i: int, station: PowerStation, buffer: Optional[Dict[str, Any]],
+                      t: int, water_inflow: float, price: float) -> float:
+        """Advance station i by one step and return the energy generated (kWh)."""
+        schedule = self.gate_schedules[i]
+        if schedule is not None:
+            station.set_gate_opening(schedule[min(t, len(schedule) - 1)])
+
+        # First station uses precipitation, others use delayed flow
+        if i == 0:
+            station.update_water_level(water_input_m3=water_inflow)
+        else:
+            # TODO: cambiar la forma de aplicar el retado por completo
+            #   inflow[station, t] = outfow[station - 1, t - retardo]
+            inflow = self._process_buffer(buffer, station.outflow) * self.route_losses[i - 1]
+            station.inflow = inflow
+            station.update_water_level()
+
+        # New calculation: outflow = 1/1,000,000 of max capacity (per 15-minute step)
+        outflow_per_million = station.max_water_level / 100
+        station.set_outflow(outflow_per_million)  # Fixed flow based on max capacity
+
+        # Generate electricity
+        return station.generate_electricity(price)
+
     def get_system_state(self) -> List[Dict]:
         """Get current state of all stations."""
         return [station.get_state() for station in self.power_stations]
@@ -153,3 +181,121 @@ class PowerStationSystem:
             raise ValueError("Need exactly 7 opening values")
         for station, opening in zip(self.power_stations, openings):
             station.set_gate_opening(opening)
+
+    def set_gate_schedule(self, station_id: int, schedule: Optional[Sequence[float]]):
+        """
+        Set a per-step gate opening schedule for one station (None to use its fixed opening).
+
+        Applied by both simulate_step and simulate_trajectories; the last value
+        is held once the schedule runs out.
+        """
+        if not 0 <= station_id < len(self.power_stations):
+            raise ValueError(f"Invalid station_id: {station_id}")
+        if schedule is None:
+            self.gate_schedules[station_id] = None
+        else:
+            self.gate_schedules[station_id] = np.clip(np.asarray(schedule, dtype=float), 0, 1)
+
+    def clear_trajectory_cache(self):
+        """Drop all cached station trajectories."""
+        self._trajectory_cache.clear()
+
+    def _station_key(self, i: int, n_steps: int, upstream_key: str) -> str:
+        """Hash the parameters of station i together with the key of its upstream trajectory."""
+        station = self.power_stations[i]
+        h = hashlib.sha1(upstream_key.encode())
+        h.update(repr((
+            n_steps,
+            float(station.max_water_level),
+            float(station.initial_water_level),
+            float(station.loss_coefficient),
+            float(self.route_losses[i - 1]) if i > 0 else None,
+            int(self.delays[i - 1]) if i > 0 else None,
+        )).encode())
+        # With a schedule, gate_opening is overwritten every step and does not matter
+        schedule = self.gate_schedules[i]
+        if schedule is not None:
+            h.update(schedule.tobytes())
+        else:
+            h.update(repr(float(station.gate_opening)).encode())
+        return h.hexdigest()
+
+    def _inputs_key(self) -> str:
+        """Hash the precipitation and price series shared by every station."""
+        h = hashlib.sha1()
+        h.update(self.precip_data['water_input_m3'].to_numpy(dtype=float).tobytes())
+        h.update(self.price_data['final_price_€kWh'].to_numpy(dtype=float).tobytes())
+        return h.hexdigest()
+
+    def _simulate_station(self, i: int, n_steps: int,
+                          step_precip: np.ndarray, step_prices: np.ndarray) -> Dict[str, np.ndarray]:
+        """
+        Simulate station i alone from its initial state for n_steps.
+
+        Runs _step_station on a fresh copy of the station and its delay buffer,
+        so the live system is untouched and the result can be cached.
+        """
+        original = self.power_stations[i]
+        station = PowerStation(
+            max_water_level=original.max_water_level,
+            initial_water_level=original.initial_water_level,
+            loss_coefficient=original.loss_coefficient,
+            station_id=original.station_id,
+            is_first=original.is_first)
+        station.gate_opening = original.gate_opening
+        buffer = {'data': np.zeros(self.delays[i - 1]), 'ptr': 0} if i > 0 else None
+
+        outflows = np.zeros(n_steps)
+        levels = np.zeros(n_steps)
+        energy = np.zeros(n_steps)
+        for t in range(n_steps):
+            energy[t] = self._step_station(i, station, buffer, t, step_precip[t], step_prices[t])
+            outflows[t] = station.outflow
+            levels[t] = station.water_level
+
+        return {
+            'outflows': outflows,
+            'water_levels': levels,
+            'energy': energy,
+            'revenue': energy * step_prices
+        }
+
+    def simulate_trajectories(self, n_steps: int) -> Dict[str, List[np.ndarray]]:
+        """
+        Simulate n_steps from the initial state and return per-station trajectories.
+
+        Each station's trajectory is cached under a key built from its own
+        parameters and the key of the station above it, so after changing a
+        parameter only that station and the ones downstream are recomputed.
+        The live system state (current_time, historic_data) is not modified.
+        At most trajectory_cache_size trajectories are kept, least recently
+        used first out. The returned arrays are shared with the cache and
+        read-only; copy them before modifying.
+        """
+        precip = self.precip_data['water_input_m3'].to_numpy(dtype=float)
+        prices = self.price_data['final_price_€kWh'].to_numpy(dtype=float)
+
+        # Same row rule as get_current_conditions: both series are indexed by the precipitation row
+        rows = np.arange(n_steps) % len(precip)
+        if rows.size and rows.max() >= len(prices):
+            raise RuntimeError("Time series data doesn't cover simulation period")
+        step_precip = precip[rows]
+        step_prices = prices[rows]
+
+        results = {'outflows': [], 'water_levels': [], 'energy': [], 'revenue': []}
+        key = self._inputs_key()
+        for i in range(len(self.power_stations)):
+            key = self._station_key(i, n_steps, key)
+            trajectory = self._trajectory_cache.get(key)
+            if trajectory is None:
+                trajectory = self._simulate_station(i, n_steps, step_precip, step_prices)
+                for values in trajectory.values():
+                    values.flags.writeable = False
+                self._trajectory_cache[key] = trajectory
+                while len(self._trajectory_cache) > self.trajectory_cache_size:
+                    self._trajectory_cache.popitem(last=False)
+            else:
+                self._trajectory_cache.move_to_end(key)
+            for name, values in trajectory.items():
+                results[name].append(values)
+        return results
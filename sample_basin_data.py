@@ -0,0 +1,29 @@
+import numpy as np
+import pandas as pd
+
+
+def write_basin(directory, precip_scale: float = 1.0, n_precip: int = 96, n_prices: int = 96):
+    """Write a small 7-station basin to directory and return its CSV paths."""
+    pd.DataFrame({
+        'station_id': list(range(7)),
+        'max_water_level_m3': [2_500_000, 1_800_000, 1_200_000, 1_500_000, 2_000_000, 1_600_000, 2_200_000],
+        'initial_water_level_m3': [1_500_000, 900_000, 600_000, 750_000, 1_000_000, 800_000, 1_100_000],
+        'loss_coefficient': [0.999998, 0.999997, 0.999996, 0.999991, 0.999989, 0.999997, 0.999995],
+        'previous_distance_km': [0, 15, 20, 10, 25, 18, 12],
+        'route_loss': [0, 0.95, 0.93, 0.97, 0.94, 0.96, 0.95],
+        'delay_intervals': [0, 2, 3, 1, 4, 2, 3],
+    }).to_csv(directory / 'power_stations_config.csv', index=False)
+
+    rng = np.random.default_rng(0)
+    pd.DataFrame({
+        'water_input_m3': rng.uniform(0, 20_000, n_precip) * precip_scale,
+    }).to_csv(directory / 'precipitation.csv', index=False)
+    pd.DataFrame({
+        'final_price_€kWh': rng.uniform(0.05, 0.15, n_prices),
+    }).to_csv(directory / 'electricity_prices.csv', index=False)
+
+    return {
+        'config_path': str(directory / 'power_stations_config.csv'),
+        'precipitation_path': str(directory / 'precipitation.csv'),
+        'price_path': str(directory / 'electricity_prices.csv'),
+    }
@@ -0,0 +1,109 @@
+import os
+import sys
+import time
+import threading
+import signal
+import multiprocessing as mp
+import numpy as np
+import pytest
+import multi_basin
+from multi_basin import BasinConfig, BasinLink, MultiBasinCoordinator
+from power_station_system import PowerStationSystem
+from sample_basin_data import write_basin
+
+N_STEPS = 200
+
+
+@pytest.fixture
+def basins(tmp_path):
+    configs = []
+    for b in range(3):
+        directory = tmp_path / f'basin_{b}'
+        directory.mkdir()
+        configs.append(BasinConfig(**write_basin(directory, precip_scale=1.0 + b)))
+    return configs
+
+
+@pytest.fixture
+def links():
+    return [BasinLink(upstream=0, downstream=1, route_loss=0.9, delay_intervals=4),
+            BasinLink(upstream=1, downstream=2, route_loss=0.8, delay_intervals=6)]
+
+
+def simulate_sequentially(basins, links, n_steps):
+    """Reference run: all basins in one process, boundary flows applied step by step."""
+    systems = [PowerStationSystem(config.config_path, config.precipitation_path, config.price_path)
+               for config in basins]
+    outflows = np.zeros((len(basins), n_steps))
+    for t in range(n_steps):
+        for b, system in enumerate(systems):
+            boundary_inflow = sum(outflows[link.upstream, t - link.delay_intervals] * link.route_loss
+                                  for link in links if link.downstream == b and t >= link.delay_intervals)
+            system.simulate_step(boundary_inflow=boundary_inflow)
+            outflows[b, t] = system.power_stations[-1].outflow
+    return outflows, [(system.get_total_energy(), system.get_total_revenue()) for system in systems]
+
+
+def test_matches_sequential_reference_for_any_worker_count(basins, links):
+    reference_outflows, reference_totals = simulate_sequentially(basins, links, N_STEPS)
+
+    for n_workers in (1, 3):
+        coordinator = MultiBasinCoordinator(basins, links, n_workers=n_workers)
+        results = coordinator.run(N_STEPS)
+        np.testing.assert_array_equal(coordinator.boundary_outflows, reference_outflows)
+        assert [(r['total_energy'], r['total_revenue']) for r in results] == reference_totals
+        assert all(type(r['total_energy']) is float for r in results)
+
+
+def test_worker_error_is_reported_with_its_cause(basins, links):
+    os.remove(basins[1].precipitation_path)
+    coordinator = MultiBasinCoordinator(basins, links, n_workers=3)
+    with pytest.raises(RuntimeError, match="basin 1") as excinfo:
+        coordinator.run(N_STEPS)
+    assert isinstance(excinfo.value.__cause__, FileNotFoundError)
+
+
+@pytest.mark.skipif(mp.get_start_method() != 'fork', reason="patching the barrier needs fork")
+def test_slow_failing_worker_still_reports_its_cause(basins, links, monkeypatch):
+    # The culprit lingers after aborting the barrier while the released shards exit fast
+    make_barrier = mp.Barrier
+
+    def slow_abort_barrier(*args, **kwargs):
+        barrier = make_barrier(*args, **kwargs)
+        abort = barrier.abort
+
+        def slow_abort():
+            abort()
+            error = sys.exc_info()[1]
+            if error is not None and not isinstance(error, threading.BrokenBarrierError):
+                time.sleep(0.3)
+
+        barrier.abort = slow_abort
+        return barrier
+
+    monkeypatch.setattr(multi_basin.mp, 'Barrier', slow_abort_barrier)
+    os.remove(basins[1].precipitation_path)
+    coordinator = MultiBasinCoordinator(basins, links, n_workers=3)
+    with pytest.raises(RuntimeError, match="basin 1") as excinfo:
+        coordinator.run(N_STEPS)
+    assert isinstance(excinfo.value.__cause__, FileNotFoundError)
+
+
+@pytest.mark.skipif(mp.get_start_method() != 'fork', reason="patching the worker needs fork")
+def test_killed_worker_does_not_hang(basins, links, monkeypatch):
+    run_shard = multi_basin._run_shard
+
+    def killed_shard(basin_ids, *args):
+        if 0 in basin_ids:
+            os.kill(os.getpid(), signal.SIGKILL)
+        run_shard(basin_ids, *args)
+
+    monkeypatch.setattr(multi_basin, '_run_shard', killed_shard)
+    coordinator = MultiBasinCoordinator(basins, links, n_workers=3, barrier_timeout=30)
+    with pytest.raises(RuntimeError, match="exited with code"):
+        coordinator.run(N_STEPS)
+
+
+def test_rejects_empty_basin_list():
+    with pytest.raises(ValueError):
+        MultiBasinCoordinator([])
@@ -0,0 +1,100 @@
+import numpy as np
+import pytest
+from power_station_system import PowerStationSystem
+from sample_basin_data import write_basin
+
+
+@pytest.fixture
+def basin_paths(tmp_path):
+    return write_basin(tmp_path)
+
+
+def test_trajectories_match_step_simulation(basin_paths, capsys):
+    n_steps = 300
+    live = PowerStationSystem(**basin_paths)
+    what_if = PowerStationSystem(**basin_paths)
+    for system in (live, what_if):
+        system.set_gate_openings([1.0, 0.5, 0.8, 1.0, 0.3, 0.9, 0.7])
+        system.set_gate_schedule(4, np.linspace(0, 1, 150))
+
+    for _ in range(n_steps):
+        live.simulate_step()
+    capsys.readouterr()
+
+    trajectories = what_if.simulate_trajectories(n_steps)
+    for name in ('outflows', 'energy', 'revenue'):
+        for i in range(7):
+            np.testing.assert_allclose(trajectories[name][i], live.historic_data[name][i], rtol=1e-12)
+
+
+def test_trajectories_follow_step_simulation_price_rows(tmp_path, capsys):
+    # Prices are indexed by the precipitation row, so extra price rows are never used
+    basin_paths = write_basin(tmp_path, n_precip=48, n_prices=96)
+    live = PowerStationSystem(**basin_paths)
+    for _ in range(150):
+        live.simulate_step()
+    capsys.readouterr()
+
+    trajectories = PowerStationSystem(**basin_paths).simulate_trajectories(150)
+    for i in range(7):
+        np.testing.assert_allclose(trajectories['revenue'][i], live.historic_data['revenue'][i], rtol=1e-12)
+
+
+def test_trajectories_reject_short_price_series(tmp_path, capsys):
+    basin_paths = write_basin(tmp_path, n_precip=96, n_prices=48)
+    live = PowerStationSystem(**basin_paths)
+    with pytest.raises(RuntimeError):
+        for _ in range(60):
+            live.simulate_step()
+    capsys.readouterr()
+
+    with pytest.raises(RuntimeError):
+        PowerStationSystem(**basin_paths).simulate_trajectories(60)
+
+
+def test_only_changed_station_and_downstream_are_recomputed(basin_paths):
+    system = PowerStationSystem(**basin_paths)
+    before = system.simulate_trajectories(50)
+    assert len(system._trajectory_cache) == 7
+
+    system.power_stations[4].loss_coefficient = 0.99
+    after = system.simulate_trajectories(50)
+    assert len(system._trajectory_cache) == 10
+    for i in range(4):
+        assert after['outflows'][i] is before['outflows'][i]
+    for i in range(4, 7):
+        assert after['outflows'][i] is not before['outflows'][i]
+
+
+def test_scheduled_gate_is_not_affected_by_live_stepping(basin_paths, capsys):
+    system = PowerStationSystem(**basin_paths)
+    system.set_gate_schedule(4, np.linspace(0, 1, 20))
+    before = system.simulate_trajectories(20)
+    for _ in range(10):
+        system.simulate_step()
+    capsys.readouterr()
+
+    after = system.simulate_trajectories(20)
+    assert len(system._trajectory_cache) == 7
+    assert after['outflows'][6] is before['outflows'][6]
+
+
+def test_cached_trajectories_are_read_only(basin_paths):
+    system = PowerStationSystem(**basin_paths)
+    outflows = system.simulate_trajectories(20)['outflows'][0]
+    with pytest.raises(ValueError):
+        outflows[:] = 0
+
+
+def test_trajectory_cache_is_bounded(basin_paths):
+    system = PowerStationSystem(**basin_paths, trajectory_cache_size=10)
+    for coefficient in (0.99, 0.98, 0.97, 0.96):
+        system.power_stations[4].loss_coefficient = coefficient
+        system.simulate_trajectories(20)
+    assert len(system._trajectory_cache) == 10
+
+
+def test_gate_schedule_rejects_invalid_station(basin_paths):
+    system = PowerStationSystem(**basin_paths)
+    with pytest.raises(ValueError):
+        system.set_gate_schedule(-1, [0.5])